@@ -0,0 +1,76 @@
+# --- Microbenchmark: face vector pipeline ---
+# Times the real vector path (face_vectors.process_face_to_vector -> to_wire_vector)
+# through the request serialization the Pinecone REST and gRPC clients perform,
+# against the previous list-based process_face_to_vector. No Pinecone client is
+# created and no requests are sent.
+#
+# Run from the project root so .streamlit/secrets.toml is found:
+#   python benchmarks/bench_vector_pipeline.py
+
+import json
+import os
+import sys
+import timeit
+
+import cv2
+import numpy as np
+from pinecone.db_data.request_factory import IndexRequestFactory
+from pinecone.openapi_support.serializer import Serializer
+
+try:
+    from pinecone.core.grpc.protos.db_data_2025_04_pb2 import QueryRequest
+except (ImportError, TypeError):
+    # Installed without the grpc extra (pinecone[grpc]), or its protos failed to load; only the REST path is measured.
+    QueryRequest = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import config
+import face_vectors
+
+REPEAT = 200
+
+FACE = np.random.default_rng(0).integers(0, 256, size=(120, 120, 3), dtype=np.uint8)
+
+
+def process_face_to_list(face_image_bgr):
+    """The previous process_face_to_vector, kept as the baseline."""
+    resized_face = cv2.resize(face_image_bgr, config.IMAGE_SIZE)
+    rgb_face = cv2.cvtColor(resized_face, cv2.COLOR_BGR2RGB)
+    return rgb_face.flatten().astype(np.float32).tolist()
+
+
+# --- Client Request Serialization ---
+
+def rest_query_body(vector):
+    """Builds and encodes a query body the way the REST client does."""
+    request = IndexRequestFactory.query_request(top_k=1, vector=vector, include_metadata=True)
+    return json.dumps(Serializer.sanitize_for_serialization(request))
+
+def grpc_query_body(vector):
+    """Builds and encodes a query message the way the gRPC client does."""
+    return QueryRequest(vector=vector, top_k=1, include_metadata=True).SerializeToString()
+
+
+def report(label, func, number=REPEAT):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"{label:<48} {seconds * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    current_vector = lambda: face_vectors.to_wire_vector(face_vectors.process_face_to_vector(FACE))
+
+    report("process_face (baseline list)", lambda: process_face_to_list(FACE))
+    report("process_face + to_wire_vector", current_vector)
+    report("REST query (baseline list)", lambda: rest_query_body(process_face_to_list(FACE)))
+    report("REST query (to_wire_vector)", lambda: rest_query_body(current_vector()))
+    report("REST placeholder query (rebuilt)", lambda: rest_query_body([1.0] * config.VECTOR_DIMENSION))
+    report("REST placeholder query (precomputed)", lambda: rest_query_body(config.PLACEHOLDER_VECTOR))
+
+    if QueryRequest is None:
+        print("pinecone[grpc] not installed; skipping gRPC measurements.")
+    else:
+        report("gRPC query (baseline list)", lambda: grpc_query_body(process_face_to_list(FACE)))
+        report("gRPC query (to_wire_vector)", lambda: grpc_query_body(current_vector()))
+        report("gRPC placeholder query (rebuilt)", lambda: grpc_query_body([1.0] * config.VECTOR_DIMENSION))
+        report("gRPC placeholder query (precomputed)", lambda: grpc_query_body(config.PLACEHOLDER_VECTOR))
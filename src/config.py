@@ -16,7 +16,22 @@ ATTENDANCE_INDEX_NAME = st.secrets.get("ATTENDANCE_INDEX_NAME", "attendance-data
 
 VECTOR_DIMENSION = int(st.secrets['VECTOR_DIMENSION']) # 50 * 50 * 3 (for resized RGB face)
 IMAGE_SIZE = (50, 50)
+PLACEHOLDER_VECTOR = [1.0] * VECTOR_DIMENSION # Built once; used for metadata-only queries and attendance records
 SCORE_THRESHOLD = float(st.secrets['SCORE_THRESHOLD']) # Minimum score for a face match
+PINECONE_USE_GRPC = str(st.secrets.get("PINECONE_USE_GRPC", True)).strip().lower() in ("true", "1", "yes") # Binary gRPC transport, falls back to REST
+
+# Face gallery sharding: students are spread over shards by a hash of their name
+GALLERY_SHARD_COUNT = int(st.secrets.get("GALLERY_SHARD_COUNT", 1)) # 1 = single FACE_INDEX, no sharding
+GALLERY_SHARD_MODE = st.secrets.get("GALLERY_SHARD_MODE", "namespace") # "namespace" in FACE_INDEX or separate "index"
+SHARD_QUERY_TIMEOUT = float(st.secrets.get("SHARD_QUERY_TIMEOUT", 2.0)) # Seconds to wait for shards before merging
+if GALLERY_SHARD_COUNT < 1:
+    raise ValueError(f"GALLERY_SHARD_COUNT must be at least 1, got {GALLERY_SHARD_COUNT}.")
+if GALLERY_SHARD_MODE not in ("namespace", "index"):
+    raise ValueError(f"Unknown GALLERY_SHARD_MODE '{GALLERY_SHARD_MODE}'. Use 'namespace' or 'index'.")
+
+# Local gallery snapshot of FACE_INDEX used for warm start and offline recognition (optional)
+GALLERY_SNAPSHOT_PATH = st.secrets.get("GALLERY_SNAPSHOT_PATH", "")
+GALLERY_DELTA_QUERY = str(st.secrets.get("GALLERY_DELTA_QUERY", False)).strip().lower() in ("true", "1", "yes") # Also query the index every frame for faces newer than the snapshot
 
 # --- OpenCV/Utilities ---
 
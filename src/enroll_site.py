@@ -7,8 +7,6 @@ import pinecone_service
 import config 
 from PIL import Image
 
-from pinecone_service import FACE_INDEX
-
 def enroll_page(session_state):
     
     if 'CASCADE_CLASSIFIER' not in dir(config):
@@ -24,9 +22,11 @@ def enroll_page(session_state):
     
     st.info("Enrollment requires one clear, high-quality picture. The system will create 100 near-identical samples from this picture to train the model in Pinecone.")
 
-    if name and roll_no:
-        query_results = FACE_INDEX.query(
-                vector = [1.0] * config.VECTOR_DIMENSION,
+    if name and roll_no and pinecone_service.shard_for(name) is None:
+        st.error("Face gallery is not available. Check the console for Pinecone errors.")
+    elif name and roll_no:
+        query_results = pinecone_service.shard_for(name).query(
+                vector = config.PLACEHOLDER_VECTOR,
                 filter={"student_name":name},
                 top_k=1,
                 include_metadata=True
@@ -83,7 +83,8 @@ def enroll_page(session_state):
                             
                             # Process the single BGR face to get the base feature vector
                             # NOTE: Assuming pinecone_service.process_face_to_vector expects BGR or handles conversion internally.
-                            base_vector = pinecone_service.process_face_to_vector(cropped_face_bgr)
+                            # Converted to the wire format once; the batch below repeats the same list.
+                            base_vector = pinecone_service.to_wire_vector(pinecone_service.process_face_to_vector(cropped_face_bgr))
                             
                             # Create a batch of 100 identical vectors to simulate the 100 samples required by the original logic.
                             vectors_to_upload = [base_vector] * 100
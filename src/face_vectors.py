@@ -0,0 +1,33 @@
+# --- Face Vector Conversion ---
+# Kept free of Pinecone setup so it can be imported without connecting (e.g. by the benchmarks).
+
+import numpy as np
+import cv2
+
+import config
+
+
+def process_face_to_vector(face_image_bgr):
+    """Converts a BGR face image to the 7500-dim float vector for Pinecone.
+        Args:
+            face_image_bgr (np.ndarray): The cropped face image in BGR format.
+        Returns:
+            np.ndarray: The flattened face vector as a contiguous float32 array.
+    """
+    resized_face = cv2.resize(face_image_bgr, config.IMAGE_SIZE)
+    rgb_face = cv2.cvtColor(resized_face, cv2.COLOR_BGR2RGB)
+    vector = rgb_face.reshape(-1).astype(np.float32)
+    return vector
+
+def to_wire_vector(vector):
+    """Converts a face vector to the list of floats sent by the Pinecone client.
+        Both the gRPC and REST clients serialize plain lists, so this is the only
+        place a vector leaves NumPy.
+        Args:
+            vector (np.ndarray or list): The face vector.
+        Returns:
+            list: The vector as a list of floats.
+    """
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return vector
@@ -0,0 +1,409 @@
+# --- Import dependencies ---
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+import config
+
+# --- Snapshot File Layout ---
+# MAGIC (8 bytes) | header length (uint64, little endian) | JSON header | padding
+# | float32 vectors (count x dimension, C order) | float32 vector norms (count)
+# The data block is aligned so it can be memory-mapped directly with NumPy.
+
+MAGIC = b"FACESNAP"
+FORMAT_VERSION = 1
+DATA_ALIGNMENT = 64
+FETCH_BATCH_SIZE = 100
+QUERY_PAGE_SIZE = 10000 # Largest top_k Pinecone allows for ID-only queries
+
+
+class SnapshotError(ValueError):
+    """Raised when a gallery snapshot is missing, corrupted or does not match the index."""
+
+
+class GallerySnapshot:
+    """In-memory view of a gallery snapshot file.
+        Vectors and norms are read-only memory maps, so loading does not copy the gallery.
+        Deleted students are hidden with an `active` mask until the file is saved or refreshed.
+    """
+
+    def __init__(self, path, header, vectors, norms):
+        self.path = path
+        self.index_name = header["index_name"]
+        self.version = header["version"]
+        self.dimension = header["dimension"]
+        self.checksum = header["checksum"]
+        self.ids = header["ids"]
+        self.metadata = header["metadata"]
+        self.vectors = vectors
+        self.norms = norms
+        self.active = np.ones(len(self.ids), dtype=bool)
+        self.added = []
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def recognize(self, face_vector):
+        """Finds the closest enrolled face by cosine similarity.
+            Args:
+                face_vector (list or np.ndarray): The face vector to recognize.
+            Returns:
+                tuple: (recognized_name (str), recognized_roll_no (str), match_score (float))
+        """
+        if len(self) == 0:
+            return "Unknown", "", 0.0
+
+        query = np.asarray(face_vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return "Unknown", "", 0.0
+
+        scores = self.vectors @ (query / query_norm)
+        scores = np.divide(scores, self.norms, out=np.zeros_like(scores), where=self.norms > 0)
+        scores[~self.active] = -np.inf
+
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+        if best_score > config.SCORE_THRESHOLD:
+            meta = self.metadata[best]
+            return meta.get("student_name", "Unknown"), meta.get("roll_no", ""), best_score
+
+        return "Unknown", "", 0.0
+
+    def discard_student(self, student_name):
+        """Hides all vectors of a student from local recognition."""
+        for row, meta in enumerate(self.metadata):
+            if meta.get("student_name") == student_name:
+                self.active[row] = False
+
+    def update_roll_no(self, student_name, new_roll_no):
+        """Updates the roll number of a student in the in-memory metadata table."""
+        for meta in self.metadata:
+            if meta.get("student_name") == student_name:
+                meta["roll_no"] = new_roll_no
+
+    def add_vectors(self, ids, metadata, vectors):
+        """Queues newly enrolled vectors to be written on the next save()."""
+        known_ids = set(self.ids)
+        for vector_id, meta, vector in zip(ids, metadata, vectors):
+            if vector_id not in known_ids:
+                self.added.append((vector_id, meta, np.asarray(vector, dtype=np.float32)))
+
+    def save(self):
+        """Rewrites the snapshot file without discarded students, with the updated metadata
+            and with vectors queued by add_vectors().
+            The version is kept, so changes made in the index since then are still pulled on refresh.
+        """
+        rows = np.flatnonzero(self.active)
+        ids = [self.ids[row] for row in rows] + [vector_id for vector_id, _, _ in self.added]
+        metadata = [self.metadata[row] for row in rows] + [meta for _, meta, _ in self.added]
+        vectors = np.array(self.vectors[rows], dtype=np.float32)
+        if self.added:
+            vectors = np.concatenate([vectors, np.stack([vector for _, _, vector in self.added])])
+
+        # Drop the memory maps before the file is replaced; a mapped file cannot be replaced on Windows.
+        # The snapshot object is unusable afterwards and must be reloaded.
+        self.vectors = self.norms = None
+        return write_snapshot(self.path, self.index_name, self.version, ids, metadata, vectors)
+
+
+# --- Checksum and File I/O ---
+
+def _compute_checksum(version, dimension, ids, metadata, vectors, norms):
+    """Computes the SHA-256 checksum over the metadata table and vector data."""
+    table = json.dumps(
+        {"version": version, "dimension": dimension, "ids": ids, "metadata": metadata},
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(table.encode("utf-8"))
+    if len(ids):
+        digest.update(np.ascontiguousarray(vectors, dtype=np.float32).data)
+        digest.update(np.ascontiguousarray(norms, dtype=np.float32).data)
+    return digest.hexdigest()
+
+
+def write_snapshot(path, index_name, version, ids, metadata, vectors):
+    """Writes a gallery snapshot atomically.
+        Args:
+            path (str): Destination file path.
+            index_name (str): Name of the Pinecone index the vectors came from.
+            version (float): Unix timestamp the snapshot is consistent with.
+            ids (list): Vector IDs, one per row of `vectors`.
+            metadata (list): Metadata dictionaries, one per row of `vectors`.
+            vectors (np.ndarray): Face vectors of shape (count, VECTOR_DIMENSION).
+        Returns:
+            str: The checksum of the written snapshot.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), config.VECTOR_DIMENSION)
+    norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+    checksum = _compute_checksum(version, config.VECTOR_DIMENSION, ids, metadata, vectors, norms)
+
+    header = json.dumps({
+        "format_version": FORMAT_VERSION,
+        "index_name": index_name,
+        "version": version,
+        "dimension": config.VECTOR_DIMENSION,
+        "count": len(ids),
+        "checksum": checksum,
+        "ids": ids,
+        "metadata": metadata,
+    }).encode("utf-8")
+
+    prefix_length = len(MAGIC) + 8 + len(header)
+    padding = (-prefix_length) % DATA_ALIGNMENT
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * padding)
+        f.write(vectors.tobytes())
+        f.write(norms.tobytes())
+    os.replace(tmp_path, path)
+
+    print(f"Gallery snapshot written to {path}: {len(ids)} vectors, version {version}.")
+    return checksum
+
+
+def load_snapshot(path, verify=True):
+    """Loads a gallery snapshot without copying the vector data.
+        Args:
+            path (str): Snapshot file path.
+            verify (bool): Recompute the checksum to detect corrupted files. This reads
+                the whole file, so startup loads skip it and rely on the header and size checks.
+        Returns:
+            GallerySnapshot: The loaded snapshot.
+    """
+    if not os.path.exists(path):
+        raise SnapshotError(f"Gallery snapshot not found: {path}")
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path} is not a gallery snapshot file.")
+        try:
+            (header_length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise SnapshotError(f"Corrupted snapshot header in {path}: {e}")
+
+    if header.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version: {header.get('format_version')}")
+    if header["dimension"] != config.VECTOR_DIMENSION:
+        raise SnapshotError(
+            f"Snapshot dimension {header['dimension']} does not match VECTOR_DIMENSION {config.VECTOR_DIMENSION}."
+        )
+    if header["index_name"] != config.FACE_INDEX_NAME:
+        raise SnapshotError(
+            f"Snapshot was taken from index '{header['index_name']}', expected '{config.FACE_INDEX_NAME}'."
+        )
+
+    count, dimension = header["count"], header["dimension"]
+    prefix_length = len(MAGIC) + 8 + header_length
+    data_offset = prefix_length + (-prefix_length) % DATA_ALIGNMENT
+    norms_offset = data_offset + count * dimension * 4
+
+    if os.path.getsize(path) != norms_offset + count * 4:
+        raise SnapshotError(f"Snapshot {path} is truncated or has trailing data.")
+
+    if count:
+        vectors = np.memmap(path, dtype=np.float32, mode="r", offset=data_offset, shape=(count, dimension))
+        norms = np.memmap(path, dtype=np.float32, mode="r", offset=norms_offset, shape=(count,))
+    else:
+        vectors = np.empty((0, dimension), dtype=np.float32)
+        norms = np.empty((0,), dtype=np.float32)
+
+    if verify:
+        checksum = _compute_checksum(header["version"], dimension, header["ids"], header["metadata"], vectors, norms)
+        if checksum != header["checksum"]:
+            raise SnapshotError(f"Checksum mismatch for {path}; the snapshot is corrupted.")
+
+    return GallerySnapshot(path, header, vectors, norms)
+
+
+# --- Pinecone Export / Refresh ---
+
+def _list_all_ids(face_index):
+    """Lists every vector ID in the index or shard."""
+    all_ids = []
+    for id_batch in face_index.list():
+        all_ids.extend(id_batch)
+    return all_ids
+
+
+def _changed_ids(face_index, since, until):
+    """Lists IDs whose `updated_at` metadata falls in [since, until).
+        Queries cannot be paged, so a window that fills a whole page is split in half
+        until every window fits.
+        Returns:
+            set: The changed vector IDs.
+    """
+    results = face_index.query(
+        vector=config.PLACEHOLDER_VECTOR,
+        top_k=QUERY_PAGE_SIZE,
+        filter={"updated_at": {"$gte": since, "$lt": until}},
+        include_values=False,
+        include_metadata=False
+    )
+    if len(results.matches) < QUERY_PAGE_SIZE:
+        return {match.id for match in results.matches}
+
+    middle = (since + until) / 2
+    if not since < middle < until:
+        raise SnapshotError(f"More than {QUERY_PAGE_SIZE} vectors changed at time {since}; cannot page the changes.")
+    return _changed_ids(face_index, since, middle) | _changed_ids(face_index, middle, until)
+
+
+def _fetch_vectors(face_index, ids):
+    """Fetches vectors and metadata for the given IDs in batches.
+        Returns:
+            tuple: (ids (list), metadata (list), vectors (np.ndarray))
+    """
+    fetched_ids, metadata = [], []
+    vectors = np.empty((len(ids), config.VECTOR_DIMENSION), dtype=np.float32)
+
+    for i in range(0, len(ids), FETCH_BATCH_SIZE):
+        fetch_result = face_index.fetch(ids=ids[i:i + FETCH_BATCH_SIZE])
+        for vector_id, vector in fetch_result.vectors.items():
+            vectors[len(fetched_ids)] = vector.values
+            fetched_ids.append(vector_id)
+            metadata.append(dict(vector.metadata or {}))
+
+    return fetched_ids, metadata, vectors[:len(fetched_ids)]
+
+
+def _fetch_from_shards(face_shards, ids_per_shard):
+    """Fetches the given IDs from each shard and combines the results.
+        Returns:
+            tuple: (ids (list), metadata (list), vectors (np.ndarray))
+    """
+    ids, metadata, vector_blocks = [], [], [np.empty((0, config.VECTOR_DIMENSION), dtype=np.float32)]
+    for shard, shard_ids in zip(face_shards, ids_per_shard):
+        fetched_ids, fetched_metadata, fetched_vectors = _fetch_vectors(shard, shard_ids)
+        ids.extend(fetched_ids)
+        metadata.extend(fetched_metadata)
+        vector_blocks.append(fetched_vectors)
+    return ids, metadata, np.concatenate(vector_blocks)
+
+
+def snapshot_is_stale(snapshot, face_shards):
+    """Cheaply checks whether the index has changed since the snapshot was taken.
+        Runs one top_k=1 query per shard for vectors updated since the snapshot version and
+        compares the shard vector counts from the index stats; no IDs are listed.
+        Args:
+            snapshot (GallerySnapshot): The loaded snapshot.
+            face_shards (list): The face gallery shards (pinecone_service.FACE_SHARDS).
+        Returns:
+            bool: True if vectors were added, removed or updated after the snapshot version.
+    """
+    indexed_count = 0
+    for shard in face_shards:
+        changed_results = shard.query(
+            vector=config.PLACEHOLDER_VECTOR,
+            top_k=1,
+            filter={"updated_at": {"$gte": snapshot.version}},
+            include_values=False,
+            include_metadata=False
+        )
+        if changed_results.matches:
+            return True
+        indexed_count += shard.vector_count()
+    return indexed_count != len(snapshot.ids)
+
+
+def export_snapshot(face_shards, path):
+    """Snapshots all enrolled vectors and metadata from the face gallery to a file.
+        Args:
+            face_shards (list): The face gallery shards (pinecone_service.FACE_SHARDS).
+            path (str): Destination file path.
+        Returns:
+            str: The checksum of the written snapshot.
+    """
+    # Take the version before reading so changes made during the export are pulled on refresh.
+    version = time.time()
+    ids, metadata, vectors = _fetch_from_shards(face_shards, [_list_all_ids(shard) for shard in face_shards])
+    return write_snapshot(path, config.FACE_INDEX_NAME, version, ids, metadata, vectors)
+
+
+def refresh_snapshot(face_shards, path, output_path=None):
+    """Incrementally refreshes a snapshot, pulling only vectors added or changed since its version.
+        Args:
+            face_shards (list): The face gallery shards (pinecone_service.FACE_SHARDS).
+            path (str): Snapshot file path.
+            output_path (str): Where to write the refreshed snapshot. Defaults to path.
+        Returns:
+            str: The checksum of the refreshed snapshot.
+    """
+    output_path = output_path or path
+    try:
+        snapshot = load_snapshot(path)
+    except SnapshotError as e:
+        print(f"Warning: {e} Taking a full export instead.")
+        return export_snapshot(face_shards, output_path)
+
+    version = time.time()
+    known_ids = set(snapshot.ids)
+    current_id_set, changed_ids, ids_to_pull = set(), set(), []
+
+    for shard in face_shards:
+        shard_ids = _list_all_ids(shard)
+        try:
+            shard_changed_ids = _changed_ids(shard, snapshot.version, version)
+        except SnapshotError as e:
+            print(f"Warning: {e} Taking a full export instead.")
+            del snapshot
+            return export_snapshot(face_shards, output_path)
+
+        current_id_set.update(shard_ids)
+        changed_ids.update(shard_changed_ids)
+        ids_to_pull.append([
+            vector_id for vector_id in shard_ids
+            if vector_id not in known_ids or vector_id in shard_changed_ids
+        ])
+
+    keep_rows = [
+        row for row, vector_id in enumerate(snapshot.ids)
+        if vector_id in current_id_set and vector_id not in changed_ids
+    ]
+    new_ids, new_metadata, new_vectors = _fetch_from_shards(face_shards, ids_to_pull)
+
+    ids = [snapshot.ids[row] for row in keep_rows] + new_ids
+    metadata = [snapshot.metadata[row] for row in keep_rows] + new_metadata
+    vectors = np.concatenate([snapshot.vectors[keep_rows], new_vectors])
+
+    removed = len(known_ids - current_id_set)
+    print(f"Snapshot refresh: {len(new_ids)} pulled, {removed} removed.")
+
+    # Release the memory map before the file is replaced.
+    del snapshot
+    return write_snapshot(output_path, config.FACE_INDEX_NAME, version, ids, metadata, vectors)
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export, refresh or verify the face gallery snapshot.")
+    parser.add_argument("command", choices=["export", "refresh", "verify"])
+    parser.add_argument("path", nargs="?", default=config.GALLERY_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if not args.path:
+        parser.error("No snapshot path given and GALLERY_SNAPSHOT_PATH is not set.")
+
+    if args.command == "verify":
+        snapshot = load_snapshot(args.path)
+        print(f"Snapshot OK: {len(snapshot)} vectors, version {snapshot.version}, checksum {snapshot.checksum}.")
+    else:
+        import pinecone_service
+
+        if not pinecone_service.FACE_SHARDS:
+            raise SystemExit("Pinecone FACE_INDEX not initialized.")
+        if args.command == "export":
+            export_snapshot(pinecone_service.FACE_SHARDS, args.path)
+        else:
+            refresh_snapshot(pinecone_service.FACE_SHARDS, args.path)
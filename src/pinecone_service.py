@@ -1,22 +1,156 @@
-import numpy as np
-import cv2
 import uuid
 import os
+import re
+import time
+import zlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pinecone import Pinecone, ServerlessSpec
-from pinecone.exceptions import PineconeApiException
+from pinecone.exceptions import PineconeException
+
+try:
+    from pinecone.grpc import PineconeGRPC
+except (ImportError, TypeError):
+    # Installed without the grpc extra (pinecone[grpc]), or its protos clash with another
+    # package's in the protobuf descriptor pool (TypeError); use the REST client.
+    PineconeGRPC = None
 
 import config
+from face_vectors import process_face_to_vector, to_wire_vector
+from gallery_snapshot import load_snapshot, refresh_snapshot, snapshot_is_stale, SnapshotError
 
 # --- Initialization and Connection ---
 
+def create_client():
+    """Creates the Pinecone client, preferring the binary gRPC transport over REST.
+        Returns:
+            Pinecone: A PineconeGRPC client if available and enabled, otherwise the REST client.
+    """
+    if config.PINECONE_USE_GRPC and PineconeGRPC is not None:
+        try:
+            return PineconeGRPC(api_key=config.PINECONE_API_KEY, environment=config.PINECONE_ENVIRONMENT)
+        except Exception as e:
+            print(f"Warning: Pinecone gRPC client unavailable ({e}). Falling back to REST.")
+
+    return Pinecone(api_key=config.PINECONE_API_KEY, environment=config.PINECONE_ENVIRONMENT)
+
+class FaceShard:
+    """One shard of the face gallery: a Pinecone index, optionally restricted to a namespace.
+        Exposes the index methods used by this app with the namespace filled in.
+    """
+
+    def __init__(self, name, index, namespace=None, timeout_arg="_request_timeout", index_name=None):
+        self.name = name
+        self.index = index
+        self.namespace = namespace
+        self.index_name = index_name or name
+        # Per-request timeout keyword: "timeout" for the gRPC client, "_request_timeout" for REST.
+        self.timeout_arg = timeout_arg
+
+    def query(self, timeout=None, **kwargs):
+        if timeout is not None:
+            kwargs[self.timeout_arg] = timeout
+        return self.index.query(namespace=self.namespace, **kwargs)
+
+    def upsert(self, vectors):
+        return self.index.upsert(vectors=vectors, namespace=self.namespace)
+
+    def fetch(self, ids):
+        return self.index.fetch(ids=ids, namespace=self.namespace)
+
+    def update(self, **kwargs):
+        return self.index.update(namespace=self.namespace, **kwargs)
+
+    def delete(self, **kwargs):
+        return self.index.delete(namespace=self.namespace, **kwargs)
+
+    def list(self):
+        return self.index.list(namespace=self.namespace)
+
+    def vector_count(self):
+        stats = self.index.describe_index_stats()
+        namespace_stats = stats.namespaces.get(self.namespace or "")
+        return namespace_stats.vector_count if namespace_stats else 0
+
+def build_face_shards(pc, face_data_index, existing_index_names):
+    """Creates the face gallery shards described by GALLERY_SHARD_COUNT and GALLERY_SHARD_MODE.
+        Args:
+            pc (Pinecone): The Pinecone client.
+            face_data_index: The FACE_INDEX.
+            existing_index_names (list): Names of indexes that already exist.
+        Returns:
+            list: FaceShard objects, in shard order.
+    """
+    timeout_arg = "timeout" if PineconeGRPC is not None and isinstance(pc, PineconeGRPC) else "_request_timeout"
+
+    if config.GALLERY_SHARD_COUNT == 1:
+        return [FaceShard(config.FACE_INDEX_NAME, face_data_index, timeout_arg=timeout_arg)]
+
+    shards = []
+    for shard_no in range(config.GALLERY_SHARD_COUNT):
+        if config.GALLERY_SHARD_MODE == "namespace":
+            namespace = f"shard-{shard_no}"
+            shards.append(FaceShard(
+                namespace, face_data_index, namespace=namespace, timeout_arg=timeout_arg, index_name=config.FACE_INDEX_NAME
+            ))
+            continue
+
+        # FACE_INDEX itself is shard 0, so only the extra shards need their own indexes.
+        if shard_no == 0:
+            shards.append(FaceShard(config.FACE_INDEX_NAME, face_data_index, timeout_arg=timeout_arg))
+            continue
+
+        shard_index_name = f"{config.FACE_INDEX_NAME}-shard-{shard_no}"
+        if shard_index_name not in existing_index_names:
+            print(f"Index '{shard_index_name}' not found. Creating...")
+            pc.create_index(
+                name=shard_index_name,
+                dimension=config.VECTOR_DIMENSION,
+                metric='cosine',
+                spec=ServerlessSpec(cloud="aws", region=config.PINECONE_ENVIRONMENT)
+            )
+        shards.append(FaceShard(shard_index_name, pc.Index(shard_index_name), timeout_arg=timeout_arg))
+
+    return shards
+
+def find_stray_face_shards(pc, face_data_index, face_shards, existing_index_names):
+    """Finds namespaces and shard indexes that hold face vectors outside the current shard layout.
+        They are left behind when GALLERY_SHARD_COUNT or GALLERY_SHARD_MODE changes, and
+        are not queried until rebalance_face_shards() moves their vectors.
+        Args:
+            pc (Pinecone): The Pinecone client.
+            face_data_index: The FACE_INDEX.
+            face_shards (list): The current face gallery shards.
+            existing_index_names (list): Names of indexes that already exist.
+        Returns:
+            list: FaceShard objects for the stray namespaces and indexes.
+    """
+    current_locations = {(shard.index_name, shard.namespace or "") for shard in face_shards}
+    shard_index_pattern = re.compile(rf"^{re.escape(config.FACE_INDEX_NAME)}-shard-\d+$")
+    candidates = [(config.FACE_INDEX_NAME, face_data_index)] + [
+        (index_name, pc.Index(index_name)) for index_name in existing_index_names if shard_index_pattern.match(index_name)
+    ]
+    timeout_arg = face_shards[0].timeout_arg if face_shards else "_request_timeout"
+
+    stray_shards = []
+    for index_name, index in candidates:
+        stats = index.describe_index_stats()
+        for namespace, namespace_stats in stats.namespaces.items():
+            if namespace_stats.vector_count and (index_name, namespace) not in current_locations:
+                label = f"{index_name}/{namespace}" if namespace else f"{index_name} (default namespace)"
+                stray_shards.append(FaceShard(
+                    label, index, namespace=namespace or None, timeout_arg=timeout_arg, index_name=index_name
+                ))
+    return stray_shards
+
 def initialize_pinecone():
     """Initializes Pinecone client and connects/creates necessary indexes."""
     if not config.PINECONE_API_KEY:
         raise ValueError("PINECONE_API_KEY is missing. Please set it in your environment variables.")
 
     try:
-        pc = Pinecone(api_key=config.PINECONE_API_KEY, environment=config.PINECONE_ENVIRONMENT)
+        pc = create_client()
         
         existing_index_names = [index.name for index in pc.list_indexes()]
 
@@ -41,8 +175,26 @@ def initialize_pinecone():
                 spec=ServerlessSpec(cloud="aws", region=config.PINECONE_ENVIRONMENT)
             ) 
         attendance_index = pc.Index(config.ATTENDANCE_INDEX_NAME)
+
+        # 3. Setup Face Gallery Shards (a failure here disables recognition only, not attendance)
+        try:
+            face_shards = build_face_shards(pc, face_data_index, existing_index_names)
+        except Exception as e:
+            print(f"Face Gallery Shard Setup Error: {e}")
+            face_shards = []
+
+        # 4. Warn about face vectors the current shard layout does not query
+        if face_shards:
+            try:
+                stray_shards = find_stray_face_shards(pc, face_data_index, face_shards, existing_index_names)
+                if stray_shards:
+                    print(f"Warning: Face vectors found outside the current shard layout in "
+                          f"{', '.join(shard.name for shard in stray_shards)}. They are not recognized "
+                          f"until moved with: python src/rebalance_shards.py")
+            except Exception as e:
+                print(f"Warning: Could not check for face vectors outside the shard layout ({e}).")
         
-        return face_data_index, attendance_index
+        return face_data_index, attendance_index, face_shards
 
     except Exception as e:
         print(f"Pinecone Initialization Error: {e}")
@@ -50,88 +202,290 @@ def initialize_pinecone():
 
 
 try:
-    FACE_INDEX, ATTENDANCE_INDEX = initialize_pinecone()
+    FACE_INDEX, ATTENDANCE_INDEX, FACE_SHARDS = initialize_pinecone()
 except Exception:
     
     FACE_INDEX = None
     ATTENDANCE_INDEX = None
+    FACE_SHARDS = []
 
+# Shared pool for scatter-gather queries; spare workers keep one slow shard from blocking the next frame.
+SHARD_POOL = ThreadPoolExecutor(max_workers=2 * len(FACE_SHARDS)) if len(FACE_SHARDS) > 1 else None
 
-# --- Utility Functions ---
 
-def process_face_to_vector(face_image_bgr):
-    """Converts a BGR face image to the 7500-dim float vector for Pinecone.
+# --- Local Gallery Snapshot ---
+
+# Loaded by init_local_gallery(), not at import, so tools that only need the index skip it.
+LOCAL_GALLERY = None
+# True once the snapshot is known to match the index (or the index cannot be reached).
+LOCAL_GALLERY_FRESH = False
+_LOCAL_GALLERY_INITIALIZED = False
+# Serializes refreshes and rewrites of the snapshot file.
+_GALLERY_LOCK = threading.Lock()
+
+def init_local_gallery():
+    """Loads the gallery snapshot once per process and checks it against the index.
+        The check is cheap (see snapshot_is_stale). A stale snapshot is refreshed on a
+        background thread; if the index cannot be reached, the snapshot is used as it is.
+        Returns:
+            GallerySnapshot: The loaded snapshot, or None if there is no usable snapshot.
+    """
+    global LOCAL_GALLERY, LOCAL_GALLERY_FRESH, _LOCAL_GALLERY_INITIALIZED
+    if _LOCAL_GALLERY_INITIALIZED:
+        return LOCAL_GALLERY
+    _LOCAL_GALLERY_INITIALIZED = True
+
+    if not config.GALLERY_SNAPSHOT_PATH or not os.path.exists(config.GALLERY_SNAPSHOT_PATH):
+        return None
+
+    try:
+        # Header and size checks only; the full checksum is left to the verify/refresh commands.
+        LOCAL_GALLERY = load_snapshot(config.GALLERY_SNAPSHOT_PATH, verify=False)
+    except SnapshotError as e:
+        print(f"Warning: Gallery snapshot not loaded ({e}). Using remote FACE_INDEX only.")
+        return None
+    print(f"Loaded gallery snapshot with {len(LOCAL_GALLERY)} vectors (version {LOCAL_GALLERY.version}).")
+
+    stale = False
+    if FACE_SHARDS:
+        try:
+            stale = snapshot_is_stale(LOCAL_GALLERY, FACE_SHARDS)
+        except Exception as e:
+            print(f"Warning: Could not check gallery snapshot against the index ({e}). Using it as is.")
+
+    if stale:
+        print("Gallery snapshot is out of date. Refreshing in the background...")
+        threading.Thread(target=refresh_local_gallery, daemon=True).start()
+    else:
+        LOCAL_GALLERY_FRESH = True
+    return LOCAL_GALLERY
+
+def refresh_local_gallery():
+    """Refreshes the snapshot file from the index and swaps it in.
+        The current snapshot keeps serving recognize_face() while the refresh runs.
+    """
+    global LOCAL_GALLERY, LOCAL_GALLERY_FRESH
+    refreshed_path = config.GALLERY_SNAPSHOT_PATH + ".new"
+    with _GALLERY_LOCK:
+        try:
+            refresh_snapshot(FACE_SHARDS, config.GALLERY_SNAPSHOT_PATH, refreshed_path)
+            # Release the memory map before the file is replaced (required on Windows).
+            LOCAL_GALLERY = None
+            os.replace(refreshed_path, config.GALLERY_SNAPSHOT_PATH)
+            LOCAL_GALLERY = load_snapshot(config.GALLERY_SNAPSHOT_PATH, verify=False)
+            LOCAL_GALLERY_FRESH = True
+        except Exception as e:
+            print(f"Warning: Gallery snapshot not refreshed ({e}).")
+            if LOCAL_GALLERY is None:
+                try:
+                    LOCAL_GALLERY = load_snapshot(config.GALLERY_SNAPSHOT_PATH, verify=False)
+                except SnapshotError:
+                    pass
+
+def update_local_gallery(update):
+    """Applies a change to the local gallery and writes it back to the snapshot file.
+        If the file cannot be rewritten it is removed, so a stale snapshot is never reloaded.
+        Args:
+            update (callable): Called with the GallerySnapshot to change it in memory.
+    """
+    global LOCAL_GALLERY
+    with _GALLERY_LOCK:
+        if LOCAL_GALLERY is None:
+            return
+        update(LOCAL_GALLERY)
+        try:
+            LOCAL_GALLERY.save()
+            LOCAL_GALLERY = load_snapshot(config.GALLERY_SNAPSHOT_PATH, verify=False)
+        except (OSError, SnapshotError) as e:
+            print(f"Warning: Could not update gallery snapshot ({e}). Removing it.")
+            LOCAL_GALLERY = None
+            if os.path.exists(config.GALLERY_SNAPSHOT_PATH):
+                os.remove(config.GALLERY_SNAPSHOT_PATH)
+
+
+# --- Shard Routing ---
+
+def shard_for(student_name):
+    """Returns the face gallery shard that holds a student's vectors.
+        Students are keyed by name throughout the app, so a stable hash of the name
+        keeps all of a student's vectors (and roll number updates) on one shard.
+        Args:
+            student_name (str): The name of the student.
+        Returns:
+            FaceShard: The student's shard, or None if Pinecone is not initialized.
+    """
+    if not FACE_SHARDS:
+        return None
+    return FACE_SHARDS[zlib.crc32(student_name.encode("utf-8")) % len(FACE_SHARDS)]
+
+def query_face_shards(vector, top_k, **kwargs):
+    """Queries every face gallery shard concurrently and merges the matches by score.
+        Each request carries SHARD_QUERY_TIMEOUT so a stalled shard releases its worker;
+        shards that fail or do not answer in time are skipped.
         Args:
-            face_image_bgr (np.ndarray): The cropped face image in BGR format.
+            vector (list): The query vector.
+            top_k (int): Number of matches to return.
         Returns:
-            list: The flattened face vector as a list of floats.
+            list: The top_k matches across all shards, best first.
     """
-    resized_face = cv2.resize(face_image_bgr, config.IMAGE_SIZE)
-    rgb_face = cv2.cvtColor(resized_face, cv2.COLOR_BGR2RGB)
-    vector = rgb_face.flatten().astype(np.float32).tolist()
-    return vector
+    if len(FACE_SHARDS) == 1:
+        try:
+            return list(FACE_SHARDS[0].query(
+                vector=vector, top_k=top_k, timeout=config.SHARD_QUERY_TIMEOUT, **kwargs
+            ).matches)
+        except Exception as e:
+            print(f"Warning: Query failed on shard '{FACE_SHARDS[0].name}': {e}")
+            return []
+
+    futures = {
+        SHARD_POOL.submit(shard.query, vector=vector, top_k=top_k, timeout=config.SHARD_QUERY_TIMEOUT, **kwargs): shard
+        for shard in FACE_SHARDS
+    }
+    done, not_done = wait(futures, timeout=config.SHARD_QUERY_TIMEOUT)
+
+    matches = []
+    for future in done:
+        try:
+            matches.extend(future.result().matches)
+        except Exception as e:
+            print(f"Warning: Query failed on shard '{futures[future].name}': {e}")
+    for future in not_done:
+        future.cancel()
+        print(f"Warning: Shard '{futures[future].name}' timed out after {config.SHARD_QUERY_TIMEOUT}s.")
+
+    matches.sort(key=lambda match: match.score, reverse=True)
+    return matches[:top_k]
+
+def rebalance_face_shards(dry_run=False):
+    """Moves every face vector to the shard its student hashes to under the current layout.
+        Scans the current shards and any stray namespaces or shard indexes. Vectors are
+        upserted to their shard before they are deleted from the old location, so an
+        interrupted run leaves copies rather than losing vectors; running it again finishes the move.
+        Args:
+            dry_run (bool): Only count the vectors that would move.
+        Returns:
+            int: The number of vectors moved (or that would be moved).
+    """
+    if not FACE_SHARDS:
+        print("Pinecone face gallery not initialized.")
+        return 0
+
+    pc = create_client()
+    existing_index_names = [index.name for index in pc.list_indexes()]
+    sources = FACE_SHARDS + find_stray_face_shards(pc, FACE_INDEX, FACE_SHARDS, existing_index_names)
+
+    moved = 0
+    for source in sources:
+        source_ids = [vector_id for id_batch in source.list() for vector_id in id_batch]
+        for i in range(0, len(source_ids), 100):
+            fetch_result = source.fetch(ids=source_ids[i:i + 100])
+            moves = {}
+            for vector_id, vector in fetch_result.vectors.items():
+                metadata = dict(vector.metadata or {})
+                if "student_name" not in metadata:
+                    print(f"Warning: Vector '{vector_id}' in '{source.name}' has no student_name. Skipping.")
+                    continue
+                home = shard_for(metadata["student_name"])
+                if home is not source:
+                    moves.setdefault(home, []).append((vector_id, list(vector.values), metadata))
+
+            for home, vectors in moves.items():
+                if not dry_run:
+                    home.upsert(vectors=vectors)
+                    source.delete(ids=[vector_id for vector_id, _, _ in vectors])
+                moved += len(vectors)
+                print(f"{'Would move' if dry_run else 'Moved'} {len(vectors)} vectors from '{source.name}' to '{home.name}'.")
+
+    print(f"Rebalance {'dry run ' if dry_run else ''}complete: {moved} vectors {'to move' if dry_run else 'moved'}.")
+    return moved
+
+
+# --- Utility Functions ---
 
 def enroll_face_batch(name, roll_no, vectors_to_upload):
-    """Uploads a batch of face vectors to the FACE_INDEX.
+    """Uploads a batch of face vectors to the student's shard of the FACE_INDEX.
         Args:
             name (str): The name of the person.
             roll_no (str): The roll number of the person.
-            vectors_to_upload (list): List of face vectors to upload.
+            vectors_to_upload (list): List of face vectors to upload, as lists of floats (see to_wire_vector).
         Returns:
             bool: True if upload successful, False otherwise.
     """
-    if FACE_INDEX is None:
-        print("Pinecone FACE_INDEX not initialized.")
+    if not FACE_SHARDS:
+        print("Pinecone face gallery not initialized.")
         return False
         
-    if not vectors_to_upload:
+    if len(vectors_to_upload) == 0:
         print("No vectors to upload.")
         return True # Successful, but nothing uploaded
 
     vectors_with_metadata = []
     for vector in vectors_to_upload:
         vector_id = f"{name}_{uuid.uuid4()}"
-        metadata = {"student_name": name, "roll_no": roll_no}
-        vectors_with_metadata.append((vector_id, vector, metadata))
+        metadata = {"student_name": name, "roll_no": roll_no, "updated_at": time.time()}
+        vectors_with_metadata.append((vector_id, to_wire_vector(vector), metadata))
 
     try:
+        shard = shard_for(name)
         batch_size = 32
         for i in range(0, len(vectors_with_metadata), batch_size):
             batch = vectors_with_metadata[i:i + batch_size]
-            FACE_INDEX.upsert(vectors=batch)
+            shard.upsert(vectors=batch)
         print(f"Successfully uploaded {len(vectors_with_metadata)} vectors for {name}.")
-        return True
-    except PineconeApiException as e:
+    except PineconeException as e:
         print(f"ERROR: Pinecone Upload Failed: {e}")
         return False
 
+    # Add the new vectors to the snapshot so this process recognizes the student locally.
+    uploaded_ids, uploaded_vectors, uploaded_metadata = zip(*vectors_with_metadata)
+    update_local_gallery(lambda gallery: gallery.add_vectors(uploaded_ids, uploaded_metadata, uploaded_vectors))
+    return True
+
 def recognize_face(face_vector):
     """Queries the FACE_INDEX to recognize a face vector.
+        Once a gallery snapshot is loaded and checked against the index, recognition is
+        answered locally. Students enrolled from other devices after that are only seen
+        after a restart or refresh, unless GALLERY_DELTA_QUERY is set: then the snapshot's
+        best match is compared against vectors written to the index since the snapshot,
+        at the cost of one index query per frame.
         Args:
-            face_vector (list): The face vector to recognize.
+            face_vector (np.ndarray): The face vector to recognize.
         Returns:
             tuple: (recognized_name (str), recognized_roll_no (str), match_score (float))
     """
-    if FACE_INDEX is None:
-        return "Unknown", "", 0.0
+    local_match = ("Unknown", "", 0.0)
+    if LOCAL_GALLERY is not None:
+        local_match = LOCAL_GALLERY.recognize(face_vector)
+
+    if not FACE_SHARDS:
+        return local_match
+    if LOCAL_GALLERY is not None and LOCAL_GALLERY_FRESH and not config.GALLERY_DELTA_QUERY:
+        return local_match
+
+    # With a snapshot loaded, only vectors written after it need the index; the better of the two matches wins.
+    query_filter = None
+    if LOCAL_GALLERY is not None:
+        query_filter = {"updated_at": {"$gte": LOCAL_GALLERY.version}}
         
     try:
-        query_results = FACE_INDEX.query(
-            vector=face_vector,
+        matches = query_face_shards(
+            vector=to_wire_vector(face_vector),
             top_k=1,
+            filter=query_filter,
             include_metadata=True
         )
         
-        if query_results.matches and query_results.matches[0].score > config.SCORE_THRESHOLD:
-            best_match = query_results.matches[0]
+        # Ties go to the index, whose metadata is never older than the snapshot's.
+        if matches and matches[0].score > config.SCORE_THRESHOLD and matches[0].score >= local_match[2]:
+            best_match = matches[0]
             name = best_match.metadata.get("student_name", "Unknown")
             roll_no = best_match.metadata.get("roll_no", "")
             return name, roll_no, best_match.score
         
-        return "Unknown", "", 0.0
-    except PineconeApiException as e:
+        return local_match
+    except PineconeException as e:
         print(f"ERROR: Pinecone Query Failed: {e}")
-        return "Unknown", "", 0.0
+        return local_match
 
 def mark_attendance(name, roll_no):
     """Records attendance in the ATTENDANCE_INDEX.
@@ -154,7 +508,7 @@ def mark_attendance(name, roll_no):
         if attendance_id in fetch_result.vectors:
             print(f"Attendance for {name} on {current_date} already recorded.")
             return True # Already marked
-    except PineconeApiException as e:
+    except PineconeException as e:
         print(f"Warning: Pinecone Fetch failed ({e}). Proceeding to upsert.")
 
     # 2. Upsert the new attendance record
@@ -164,16 +518,14 @@ def mark_attendance(name, roll_no):
         "date": current_date,
         "time": current_time,
     }
-    
-    placeholder_vector = [1.0] * config.VECTOR_DIMENSION 
 
     try:
         ATTENDANCE_INDEX.upsert(
-            vectors=[(attendance_id, placeholder_vector, metadata)]
+            vectors=[(attendance_id, config.PLACEHOLDER_VECTOR, metadata)]
         )
         print(f"Attendance recorded for: {name} at {current_time}.")
         return True
-    except PineconeApiException as e:
+    except PineconeException as e:
         print(f"ERROR: Pinecone upsert failed for attendance record: {e}")
         return False
         
@@ -186,10 +538,8 @@ def get_all_attendance_records():
         return []
         
     try:
-        placeholder_vector = [1.0] * config.VECTOR_DIMENSION 
-        
         query_results = ATTENDANCE_INDEX.query(
-            vector=placeholder_vector,
+            vector=config.PLACEHOLDER_VECTOR,
             top_k=10000, 
             include_metadata=True
         )
@@ -206,7 +556,7 @@ def get_all_attendance_records():
             })
         return records
 
-    except PineconeApiException as e:
+    except PineconeException as e:
         print(f"ERROR: Error querying Pinecone attendance: {e}")
         return []
     
@@ -217,13 +567,13 @@ def delete_student_data(name_to_delete):
         Returns:
             bool: True if deletion successful, False otherwise.
     """
-    if FACE_INDEX is None:
-        print("Pinecone FACE_INDEX not initialized.")
+    if not FACE_SHARDS or ATTENDANCE_INDEX is None:
+        print("Pinecone indexes not initialized.")
         return False
         
     try:
         
-        FACE_INDEX.delete(
+        shard_for(name_to_delete).delete(
             filter={"student_name": name_to_delete},
             delete_all=False 
         )
@@ -234,9 +584,11 @@ def delete_student_data(name_to_delete):
             delete_all=False
         )
 
+        update_local_gallery(lambda gallery: gallery.discard_student(name_to_delete))
+
         print(f"Successfully deleted all enrollment and attendance data for: {name_to_delete}")
         return True
-    except PineconeApiException as e:
+    except PineconeException as e:
         print(f"ERROR: Pinecone Deletion Failed: {e}")
         return False
     
@@ -246,20 +598,16 @@ def update_student_roll_no(name, new_roll_no):
     Updates the 'roll_no' metadata field for ALL vectors belonging to a specific student 
     in the FACE_INDEX and ATTENDANCE_INDEX.
     """
-    if FACE_INDEX is None or ATTENDANCE_INDEX is None:
+    if not FACE_SHARDS or ATTENDANCE_INDEX is None:
         print("Pinecone indexes not initialized.")
         return False
 
     print(f"Starting roll number update for {name} to {new_roll_no}...")
     
-    
-    placeholder_vector = [1.0] * config.VECTOR_DIMENSION
-
-    
     try:
-     
-        face_results = FACE_INDEX.query(
-            vector=placeholder_vector,
+        shard = shard_for(name)
+        face_results = shard.query(
+            vector=config.PLACEHOLDER_VECTOR,
             top_k=1000, 
             filter={"student_name": name},
             include_values=False,
@@ -273,12 +621,14 @@ def update_student_roll_no(name, new_roll_no):
         
         
         for vector_id in face_ids_to_update:
-            FACE_INDEX.update(
+            shard.update(
                 id=vector_id,
-                set_metadata={"student_name": name, "roll_no": new_roll_no}
+                set_metadata={"student_name": name, "roll_no": new_roll_no, "updated_at": time.time()}
                 
             )
 
+        update_local_gallery(lambda gallery: gallery.update_roll_no(name, new_roll_no))
+
         print(f"Updated roll no for {len(face_ids_to_update)} face vectors.")
         
     except Exception as e:
@@ -288,7 +638,7 @@ def update_student_roll_no(name, new_roll_no):
    
     try:
         attendance_results = ATTENDANCE_INDEX.query(
-            vector=placeholder_vector,
+            vector=config.PLACEHOLDER_VECTOR,
             top_k=10000, 
             filter={"student_name": name},
             include_values=False,
@@ -0,0 +1,20 @@
+# --- Face Gallery Rebalance ---
+# Moves face vectors to their shards after GALLERY_SHARD_COUNT or GALLERY_SHARD_MODE changes.
+#   python src/rebalance_shards.py --dry-run   # report what would move
+#   python src/rebalance_shards.py
+
+import argparse
+
+import pinecone_service
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move face vectors to their shards under the current shard layout.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the vectors that would move")
+    args = parser.parse_args()
+
+    if not pinecone_service.FACE_SHARDS:
+        raise SystemExit("Pinecone FACE_INDEX not initialized.")
+    try:
+        pinecone_service.rebalance_face_shards(dry_run=args.dry_run)
+    except pinecone_service.PineconeException as e:
+        raise SystemExit(f"ERROR: Rebalance failed: {e}. Run it again to finish moving the remaining vectors.")
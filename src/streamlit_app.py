@@ -30,6 +30,11 @@ if 'recognized_roll_no' not in st.session_state:
 # Check for Pinecone health early
 if pinecone_service.FACE_INDEX is None or pinecone_service.ATTENDANCE_INDEX is None:
     st.error("🚨 Pinecone initialization failed. Please check your PINECONE_API_KEY and PINECONE_ENVIRONMENT variables.")
+elif not pinecone_service.FACE_SHARDS:
+    st.error("🚨 Face gallery shard setup failed. Attendance records are available, but enrollment and recognition are disabled. Check the GALLERY_SHARD settings and the console for details.")
+
+# Load the local gallery snapshot (once per process) for recognition
+pinecone_service.init_local_gallery()
 
 
 # --- Page Rendering Logic ---